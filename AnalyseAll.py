@@ -3,7 +3,7 @@
 analyze_advanced.py
 
 Enhanced analysis comparing automated trajectories against human trajectories:
-  - Loads both human_seed_*.csv and automated_seed_*.csv
+  - Loads both human_seed_*.csv and automated_seed_*.csv via the Preprocess.py store
   - Processes trajectories (unwrap, zero at start, flip to positive quadrant, filter)
   - Computes discrete Fréchet distance matrix across all traces
   - Performs hierarchical clustering on combined set
@@ -12,108 +12,198 @@ Enhanced analysis comparing automated trajectories against human trajectories:
   - Generates per-cluster overlays, distinguishing human (blue) vs automated (red)
 
 Dependencies:
-  numpy, scipy, matplotlib, sklearn
+  numpy, pandas (Preprocess.py), numba, scipy, fastcluster, matplotlib, sklearn
+  optional: cffi, to use the C/OpenMP kernel built by build_frechet.py
 
 Usage:
-    python analyze_advanced.py [--clusters K]
+    python analyze_advanced.py [--clusters K] [--cap DIST] [--resample K]
 """
 import os
-import glob
-import csv
 import argparse
+from math import hypot, sqrt
 import numpy as np
-from scipy.cluster.hierarchy import linkage, dendrogram, fcluster
+from numba import njit, prange, float32, float64
+from scipy.cluster.hierarchy import dendrogram, fcluster
+import fastcluster
 from scipy.spatial.distance import squareform
+import matplotlib
+matplotlib.use('Agg')  # only writes PNGs, no interactive display
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from sklearn.metrics import silhouette_score
+from Preprocess import scan_csvs, load_store
 
-# unwrap and preprocess unchanged
-
-def unwrap_deg(angle_list):
-    if not angle_list:
-        return []
-    unwrapped = [angle_list[0]]
-    offset = 0.0
-    for prev, curr in zip(angle_list[:-1], angle_list[1:]):
-        diff = curr + offset - unwrapped[-1]
-        if diff > 180:
-            offset -= 360
-        elif diff < -180:
-            offset += 360
-        unwrapped.append(curr + offset)
-    return unwrapped
-
-
-def load_and_process(path):
-    xs, ys = [], []
-    with open(path, newline='') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                xs.append(float(row['x']))
-                ys.append(float(row['y']))
-            except:
-                continue
-    if len(xs) < 2:
+try:
+    # optional C/OpenMP build of frechet_matrix, see build_frechet.py
+    from _frechet import ffi as _ffi, lib as _frechet_lib
+except ImportError:
+    _frechet_lib = None
+
+
+def process(pts):
+    """Flips zeroed (ΔX, ΔY) deltas into the positive quadrant and filters."""
+    if pts is None or len(pts) < 2:
         return None
-    ys = unwrap_deg(ys)
-    x0, y0 = xs[0], ys[0]
-    dx = [x - x0 for x in xs]
-    dy = [y - y0 for y in ys]
+    xs, ys = pts[:, 0], pts[:, 1]
     # flip into positive quadrant
-    if dx[-1] < 0:
-        dx = [-d for d in dx]
-    if dy[-1] < 0:
-        dy = [-d for d in dy]
+    if xs[-1] < 0:
+        xs = -xs
+    if ys[-1] < 0:
+        ys = -ys
     # retain only non-negative
-    pts = [(x, y) for x, y in zip(dx, dy) if x >= 0 and y >= 0]
-    if len(pts) < 2:
+    mask = (xs >= 0) & (ys >= 0)
+    if np.count_nonzero(mask) < 2:
         return None
-    return np.array(pts)
-
-
-def discrete_frechet(P, Q):
-    n, m = len(P), len(Q)
-    ca = np.full((n, m), -1.0)
-    def c(i, j):
-        if ca[i, j] > -1:
-            return ca[i, j]
-        d = np.linalg.norm(P[i] - Q[j])
-        if i == 0 and j == 0:
-            ca[i, j] = d
-        elif i > 0 and j == 0:
-            ca[i, j] = max(c(i-1, 0), d)
-        elif i == 0 and j > 0:
-            ca[i, j] = max(c(0, j-1), d)
+    # float32 halves the Fréchet working set; ~7 digits is plenty here
+    return np.column_stack((xs[mask], ys[mask])).astype(np.float32)
+
+
+def resample(pts, k):
+    """Resamples a polyline to k points evenly spaced by arc length."""
+    seg = np.hypot(np.diff(pts[:, 0]), np.diff(pts[:, 1]))
+    s = np.concatenate(([0.0], np.cumsum(seg)))
+    t = np.linspace(0.0, s[-1], k)
+    return np.column_stack((np.interp(t, s, pts[:, 0]),
+                            np.interp(t, s, pts[:, 1]))).astype(np.float32)
+
+
+# stand-in for "no cap": fastmath assumes no infinities inside the kernels,
+# and the float32 maximum still squares to a finite float64
+NO_CAP = float(np.finfo(np.float32).max)
+
+
+@njit(float32(float32[:, ::1], float32[:, ::1]), cache=True, fastmath=True)
+def _frechet_lb(P, Q):
+    # every coupling pairs the two start points and the two end points
+    n, m = P.shape[0], Q.shape[0]
+    d0 = hypot(P[0, 0] - Q[0, 0], P[0, 1] - Q[0, 1])
+    d1 = hypot(P[n-1, 0] - Q[m-1, 0], P[n-1, 1] - Q[m-1, 1])
+    return max(d0, d1)
+
+
+@njit(cache=True, fastmath=True, inline='always')
+def _row_d2(P, i, Q, d2):
+    # squared distances from P[i] to all of Q; no loop-carried dependency,
+    # so unlike the DP recurrence this loop vectorizes
+    px, py = P[i, 0], P[i, 1]
+    for j in range(Q.shape[0]):
+        dx = px - Q[j, 0]
+        dy = py - Q[j, 1]
+        d2[j] = dx*dx + dy*dy
+
+
+@njit(float32(float32[:, ::1], float32[:, ::1], float64), cache=True, fastmath=True)
+def _frechet_kernel(P, Q, cap):
+    # the distance is symmetric, so run the DP along the shorter curve and
+    # keep only the previous and current rows
+    if Q.shape[0] > P.shape[0]:
+        P, Q = Q, P
+    n, m = P.shape[0], Q.shape[0]
+    # the DP works on squared distances: sqrt is monotonic, so max/min pick
+    # the same cells and a single sqrt at the end gives the distance
+    cap2 = cap * cap
+    prev = np.empty(m, dtype=np.float32)
+    cur = np.empty(m, dtype=np.float32)
+    d2 = np.empty(m, dtype=np.float32)
+    _row_d2(P, 0, Q, d2)
+    prev[0] = d2[0]
+    for j in range(1, m):
+        prev[j] = max(prev[j-1], d2[j])
+    for i in range(1, n):
+        _row_d2(P, i, Q, d2)
+        cur[0] = max(prev[0], d2[0])
+        row_min = cur[0]
+        for j in range(1, m):
+            cur[j] = max(min(prev[j], cur[j-1], prev[j-1]), d2[j])
+            row_min = min(row_min, cur[j])
+        # every coupling crosses row i and the DP never decreases along it,
+        # so the row minimum is a lower bound on the final distance
+        if row_min > cap2:
+            return sqrt(row_min)
+        prev, cur = cur, prev
+    return sqrt(prev[m-1])
+
+
+def discrete_frechet(P, Q, cap=NO_CAP):
+    """
+    Discrete Fréchet distance between P and Q. If the distance exceeds
+    cap, a lower bound that is still greater than cap may be returned.
+    """
+    P = np.ascontiguousarray(P, dtype=np.float32)
+    Q = np.ascontiguousarray(Q, dtype=np.float32)
+    return _frechet_kernel(P, Q, cap)
+
+
+@njit(parallel=True, cache=True)
+def _frechet_matrix(all_pts, starts, lengths, N, cap):
+    D = np.zeros((N, N))
+    npairs = N * (N - 1) // 2
+    for k in prange(npairs):
+        # decode flat upper-triangle index k -> (i, j) with i < j
+        i = N - 2 - int(sqrt(-8.0*k + 4.0*N*(N-1) - 7.0) / 2.0 - 0.5)
+        j = k + i + 1 - npairs + (N - i) * (N - i - 1) // 2
+        P = all_pts[starts[i]:starts[i] + lengths[i]]
+        Q = all_pts[starts[j]:starts[j] + lengths[j]]
+        lb = _frechet_lb(P, Q)
+        if lb > cap:
+            # clearly far apart: skip the O(n*m) DP
+            D[i, j] = D[j, i] = lb
         else:
-            ca[i, j] = max(min(c(i-1, j), c(i, j-1), c(i-1, j-1)), d)
-        return ca[i, j]
-    return c(n-1, m-1)
+            D[i, j] = D[j, i] = _frechet_kernel(P, Q, cap)
+    return D
+
+
+def frechet_matrix(trajs, cap=NO_CAP):
+    """
+    Pairwise discrete Fréchet distances. Pairs farther apart than cap
+    hold a lower bound (> cap) instead of their exact distance.
+    """
+    lengths = np.array([len(t) for t in trajs], dtype=np.int64)
+    starts = np.zeros(len(trajs), dtype=np.int64)
+    starts[1:] = np.cumsum(lengths)[:-1]
+    all_pts = np.ascontiguousarray(np.concatenate(trajs), dtype=np.float32)
+    if _frechet_lib is not None:
+        D = np.zeros((len(trajs), len(trajs)))
+        rc = _frechet_lib.frechet_matrix(_ffi.from_buffer('float[]', all_pts),
+                                         _ffi.from_buffer('int64_t[]', starts),
+                                         _ffi.from_buffer('int64_t[]', lengths),
+                                         len(trajs), cap,
+                                         _ffi.from_buffer('double[]', D))
+        if rc == 0:
+            return D
+        # scratch allocation failed in C; the Numba kernels still work
+    return _frechet_matrix(all_pts, starts, lengths, len(trajs), cap)
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--clusters', type=int, default=5,
                         help='Number of clusters')
+    parser.add_argument('--cap', type=float, default=None,
+                        help='Only compute exact distances up to this value; '
+                             'farther pairs keep a cheap lower bound')
+    parser.add_argument('--resample', type=int, default=None, metavar='K',
+                        help='Approximate: resample every trajectory to K '
+                             'points by arc length before comparing')
     args = parser.parse_args()
 
     base = os.path.dirname(os.path.abspath(__file__))
     # gather files
-    human_files = glob.glob(os.path.join(base, 'human_seed_*.csv'))
-    auto_files  = glob.glob(os.path.join(base, 'automated_seed_*.csv'))
+    human_files, auto_files = scan_csvs(base)
+    store = load_store(base, human_files + auto_files)
     all_files = []
     labels = []
     trajs = []
     # load human
     for p in human_files:
-        pts = load_and_process(p)
+        pts = process(store.get(p))
         if pts is None: continue
         all_files.append(p)
         labels.append('H:' + os.path.basename(p))
         trajs.append(pts)
     # load automated
     for p in auto_files:
-        pts = load_and_process(p)
+        pts = process(store.get(p))
         if pts is None: continue
         all_files.append(p)
         labels.append('A:' + os.path.basename(p))
@@ -122,16 +212,16 @@ def main():
     N = len(trajs)
     if N < 2:
         print('Not enough trajectories to compare.'); return
-    # compute distance matrix
-    D = np.zeros((N, N))
-    for i in range(N):
-        for j in range(i+1, N):
-            d = discrete_frechet(trajs[i], trajs[j])
-            D[i, j] = D[j, i] = d
+    # compute distance matrix (on resampled copies; plots keep the originals)
+    if args.resample:
+        cmp_trajs = [resample(t, args.resample) for t in trajs]
+    else:
+        cmp_trajs = trajs
+    D = frechet_matrix(cmp_trajs, NO_CAP if args.cap is None else args.cap)
 
     # clustering
     dm = squareform(D)
-    Z = linkage(dm, method='average')
+    Z = fastcluster.linkage(dm, method='average')
     # dendrogram
     plt.figure(figsize=(10,6))
     dendrogram(Z, labels=labels, leaf_rotation=90)
@@ -151,14 +241,19 @@ def main():
     for c_id in range(1, args.clusters+1):
         idx = [i for i, cl in enumerate(clusters) if cl == c_id]
         if not idx: continue
-        plt.figure()
-        for i in idx:
-            pts = trajs[i]
-            style = 'b-' if labels[i].startswith('H:') else 'r--'
-            plt.plot(pts[:,0], pts[:,1], style, alpha=0.7)
-        plt.title(f'Cluster {c_id} (n={len(idx)})')
-        plt.xlabel('ΔX'); plt.ylabel('ΔY'); plt.grid(True)
-        plt.savefig(os.path.join(base, f'cluster_{c_id}.png'))
+        # one collection per cluster instead of a Line2D per trajectory
+        human = [labels[i].startswith('H:') for i in idx]
+        lines = LineCollection([trajs[i] for i in idx],
+                               colors=['b' if h else 'r' for h in human],
+                               linestyles=['-' if h else '--' for h in human],
+                               alpha=0.7)
+        fig, ax = plt.subplots()
+        ax.add_collection(lines)
+        ax.autoscale()
+        ax.set_title(f'Cluster {c_id} (n={len(idx)})')
+        ax.set_xlabel('ΔX'); ax.set_ylabel('ΔY'); ax.grid(True)
+        fig.savefig(os.path.join(base, f'cluster_{c_id}.png'))
+        plt.close(fig)
         print(f'Cluster {c_id} plot saved.')
 
 if __name__ == '__main__':
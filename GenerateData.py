@@ -21,40 +21,49 @@ import re
 import csv
 import sys
 
-def parse_log(logfile):
-    # Pattern to detect new dataset markers
-    new_pat = re.compile(r'New dataset \(([^)]+)\), Seed f([0-9.]+)')
-    # Pattern to extract X and Y values
-    xy_pat  = re.compile(r'X:\s*f?(-?[0-9.]+),\s*Y:\s*f?(-?[0-9.]+)')
-    # Pattern to extract time (first numeric field)
-    time_pat = re.compile(r'^\d+\t([\d.]+)')
+# Pattern to detect new dataset markers
+NEW_PAT = re.compile(r'New dataset \(([^)]+)\), Seed f([0-9.]+)')
+# Pattern to extract time (first numeric field) followed by X and Y values
+ROW_PAT = re.compile(r'^\d+\t(?P<time>[\d.]+).*?'
+                     r'X:\s*f?(?P<x>-?[0-9.]+),\s*Y:\s*f?(?P<y>-?[0-9.]+)')
+
 
+def parse_log(logfile):
     outdir = os.path.dirname(logfile) or '.'
+    # only the current dataset's CSV is open; a seed that comes back later
+    # in the log is simply reopened for appending
     current_csv = None
+    out = writer = None
 
-    with open(logfile, 'r') as f:
-        for line in f:
-            # Detect new dataset
-            m_new = new_pat.search(line)
-            if m_new:
-                dtype, seed = m_new.group(1), m_new.group(2)
-                fname = f"{dtype.strip().lower().replace(' ','_')}_seed_{seed}.csv"
-                current_csv = os.path.join(outdir, fname)
-                # Create file with header if missing
-                if not os.path.exists(current_csv):
-                    with open(current_csv, 'w', newline='') as out:
-                        csv.writer(out).writerow(['time','x','y'])
-                continue
+    try:
+        with open(logfile, 'r') as f:
+            for line in f:
+                # Detect new dataset
+                m_new = NEW_PAT.search(line)
+                if m_new:
+                    dtype, seed = m_new.group(1), m_new.group(2)
+                    fname = f"{dtype.strip().lower().replace(' ','_')}_seed_{seed}.csv"
+                    path = os.path.join(outdir, fname)
+                    if path != current_csv:
+                        if out is not None:
+                            out.close()
+                        current_csv = path
+                        # Create file with header if missing
+                        is_new = not os.path.exists(current_csv)
+                        out = open(current_csv, 'a', newline='', buffering=1 << 16)
+                        writer = csv.writer(out)
+                        if is_new:
+                            writer.writerow(['time','x','y'])
+                    continue
 
-            # Detect X/Y lines
-            if current_csv:
-                m_xy = xy_pat.search(line)
-                m_time = time_pat.match(line)
-                if m_xy and m_time:
-                    time = m_time.group(1)
-                    x, y = m_xy.group(1), m_xy.group(2)
-                    with open(current_csv, 'a', newline='') as out:
-                        csv.writer(out).writerow([time, x, y])
+                # Detect X/Y lines
+                if writer is not None:
+                    m_row = ROW_PAT.match(line)
+                    if m_row:
+                        writer.writerow(m_row.group('time', 'x', 'y'))
+    finally:
+        if out is not None:
+            out.close()
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
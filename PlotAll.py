@@ -15,7 +15,7 @@ Plots:
       seed <= 0.8  -> red
       seed <= 1.0  -> yellow (or any distinct color)
 
-Each trajectory:
+Each trajectory is read from the Preprocess.py store, which:
   - Loads X/Y columns (ignores time/garbage)
   - Un-wraps Y across ±180° smoothly
   - Computes deltas relative to the first point (so start at 0,0)
@@ -25,39 +25,8 @@ Usage:
 """
 
 import os
-import glob
-import csv
 import matplotlib.pyplot as plt
-
-
-def unwrap_deg(angle_list):
-    """Unwraps a list of angles across ±180° boundary."""
-    if not angle_list:
-        return []
-    unwrapped = [angle_list[0]]
-    offset = 0.0
-    for prev, curr in zip(angle_list[:-1], angle_list[1:]):
-        diff = curr + offset - unwrapped[-1]
-        if diff > 180:
-            offset -= 360
-        elif diff < -180:
-            offset += 360
-        unwrapped.append(curr + offset)
-    return unwrapped
-
-
-def load_xy(path):
-    """Loads X and Y from a CSV with headers 'time','x','y'."""
-    xs, ys = [], []
-    with open(path, newline='') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                xs.append(float(row['x']))
-                ys.append(float(row['y']))
-            except (ValueError, KeyError):
-                continue
-    return xs, ys
+from Preprocess import scan_csvs, load_store
 
 
 def get_seed_color(seed):
@@ -74,52 +43,53 @@ def get_seed_color(seed):
         return 'yellow'
 
 
-def plot_human(files):
+def plot_human(files, data):
     for path in files:
-        xs, ys = load_xy(path)
-        if not xs:
+        pts = data[path]
+        if pts is None:
             continue
-        ys_un = unwrap_deg(ys)
-        x0, y0 = xs[0], ys_un[0]
-        dx = [x - x0 for x in xs]
-        dy = [y - y0 for y in ys_un]
         label = os.path.basename(path).replace('.csv','')
-        plt.plot(dx, dy, color='blue', label=f"Human: {label}")
+        plt.plot(pts[:,0], pts[:,1], color='blue', label=f"Human: {label}")
+
 
+def get_seed(path):
+    """Extracts the seed from a filename, e.g. automated_seed_0.537362.csv."""
+    fname = os.path.basename(path)
+    try:
+        seed_str = fname.split('_seed_')[1].rstrip('.csv')
+        return float(seed_str)
+    except (IndexError, ValueError):
+        return None
 
-def plot_automated(files):
+
+def plot_automated(files, data):
     for path in files:
-        # extract seed from filename, e.g. automated_seed_0.537362.csv
-        fname = os.path.basename(path)
-        try:
-            seed_str = fname.split('_seed_')[1].rstrip('.csv')
-            seed = float(seed_str)
-        except (IndexError, ValueError):
-            seed = None
-        xs, ys = load_xy(path)
-        if not xs or seed is None:
+        seed = get_seed(path)
+        pts = data[path]
+        if pts is None or seed is None:
             continue
-        ys_un = unwrap_deg(ys)
-        x0, y0 = xs[0], ys_un[0]
-        dx = [x - x0 for x in xs]
-        dy = [y - y0 for y in ys_un]
         color = get_seed_color(seed)
         label = f"Automated (seed={seed:.3f})"
-        plt.plot(dx, dy, color=color, label=label)
+        plt.plot(pts[:,0], pts[:,1], color=color, label=label)
 
 
 def main():
     base = os.path.dirname(os.path.abspath(__file__))
-    human_files = glob.glob(os.path.join(base, "human_seed_*.csv"))
-    auto_files  = glob.glob(os.path.join(base, "automated_seed_*.csv"))
+    human_files, auto_files = scan_csvs(base)
+    # seed order keeps same-colored trajectories together in the legend
+    auto_files.sort(key=lambda p: get_seed(p) or 0.0)
 
     if not human_files and not auto_files:
         print("No matching CSVs found in", base)
         return
 
+    data = load_store(base, human_files + auto_files)
+
+    # long trajectories: let Agg drop vertices that don't change the path
+    plt.rcParams['path.simplify_threshold'] = 1.0
     plt.figure()
-    plot_human(human_files)
-    plot_automated(auto_files)
+    plot_human(human_files, data)
+    plot_automated(auto_files, data)
 
     plt.axhline(0, color='gray', linewidth=0.5)
     plt.axvline(0, color='gray', linewidth=0.5)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Preprocess.py
+
+Builds the trajectory store shared by AnalyseAll.py and PlotAll.py from
+the human_seed_*.csv and automated_seed_*.csv files in its own directory:
+  - trajs.bin   every trajectory back to back as float32 (ΔX, ΔY) rows
+  - index.npz   name, start row, length and source mtime/size of each one
+
+Each trajectory has Y un-wrapped across ±180° and both axes zeroed at
+the first point. Files whose mtime/size are unchanged are carried over
+from the previous store instead of being parsed again. AnalyseAll.py and
+PlotAll.py rebuild the store on their own when it is out of date, so
+running this script by hand is optional.
+
+Usage:
+    python Preprocess.py
+"""
+import os
+import numpy as np
+import pandas as pd
+from TrajUtils import unwrap_deg
+
+STORE_BIN = 'trajs.bin'
+STORE_INDEX = 'index.npz'
+
+
+def scan_csvs(base):
+    """Returns (human, automated) CSV paths from a single scan of base."""
+    human, automated = [], []
+    with os.scandir(base) as it:
+        for e in it:
+            if not e.name.endswith('.csv') or not e.is_file():
+                continue
+            if e.name.startswith('human_seed_'):
+                human.append(e.path)
+            elif e.name.startswith('automated_seed_'):
+                automated.append(e.path)
+    return human, automated
+
+
+def find_csvs(base):
+    human, automated = scan_csvs(base)
+    return sorted(human + automated)
+
+
+def load_deltas(path):
+    """Loads X/Y, un-wraps Y and zeroes both at the first point."""
+    try:
+        df = pd.read_csv(path, usecols=['x', 'y'], on_bad_lines='skip')
+    except (pd.errors.EmptyDataError, ValueError):
+        # empty file, no x/y header or undecodable: skip it like bad rows
+        return None
+    df = df.apply(pd.to_numeric, errors='coerce').dropna()
+    if df.empty:
+        return None
+    xs = df['x'].to_numpy(dtype=np.float64)
+    ys = unwrap_deg(df['y'].to_numpy(dtype=np.float64))
+    return np.column_stack((xs - xs[0], ys - ys[0])).astype(np.float32)
+
+
+def _stamps(files):
+    stamps = {}
+    for p in files:
+        st = os.stat(p)
+        stamps[os.path.basename(p)] = (st.st_mtime, st.st_size)
+    return stamps
+
+
+def _bin_stamp(path):
+    st = os.stat(path)
+    return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+
+def _read_index(base):
+    path = os.path.join(base, STORE_INDEX)
+    bin_path = os.path.join(base, STORE_BIN)
+    if not (os.path.exists(path) and os.path.exists(bin_path)):
+        return None
+    with np.load(path) as idx:
+        index = {k: idx[k] for k in idx.files}
+    # an index written for a different trajs.bin (e.g. a run stopped between
+    # the two replaces in build_store) is treated as missing
+    if 'bin_stamp' not in index or not np.array_equal(index['bin_stamp'], _bin_stamp(bin_path)):
+        return None
+    return index
+
+
+def _open_bin(base, index):
+    total = int(index['lengths'].sum())
+    if total == 0:
+        return np.empty((0, 2), dtype=np.float32)
+    return np.memmap(os.path.join(base, STORE_BIN), dtype=np.float32,
+                     mode='r', shape=(total, 2))
+
+
+def build_store(base, files=None):
+    """(Re)writes trajs.bin and index.npz, re-parsing only changed files."""
+    if files is None:
+        files = find_csvs(base)
+    stamps = _stamps(files)
+
+    old = {}
+    index = _read_index(base)
+    if index is not None:
+        mm = _open_bin(base, index)
+        for name, s, l, stamp in zip(index['names'], index['starts'],
+                                     index['lengths'], index['stamps']):
+            if stamps.get(name) == tuple(stamp):
+                # copy out of the mapping, the file is about to be rewritten
+                old[name] = np.array(mm[s:s+l])
+        del mm
+
+    names = list(stamps)
+    chunks = []
+    for p, name in zip(files, names):
+        pts = old.get(name)
+        if pts is None:
+            pts = load_deltas(p)
+            # unusable files are kept as empty entries so they are not re-parsed
+            if pts is None:
+                pts = np.empty((0, 2), dtype=np.float32)
+        chunks.append(pts)
+
+    lengths = np.array([len(c) for c in chunks], dtype=np.int64)
+    starts = np.zeros(len(chunks), dtype=np.int64)
+    starts[1:] = np.cumsum(lengths)[:-1]
+    # write both files under temporary names and swap them in, bin first and
+    # index last; the index records the bin it belongs to (see _read_index)
+    bin_path = os.path.join(base, STORE_BIN)
+    index_path = os.path.join(base, STORE_INDEX)
+    with open(bin_path + '.tmp', 'wb') as f:
+        for c in chunks:
+            f.write(np.ascontiguousarray(c, dtype=np.float32).tobytes())
+    with open(index_path + '.tmp', 'wb') as f:
+        np.savez(f,
+                 names=np.array(names, dtype=str),
+                 starts=starts, lengths=lengths,
+                 stamps=np.array(list(stamps.values()), dtype=np.float64).reshape(-1, 2),
+                 bin_stamp=_bin_stamp(bin_path + '.tmp'))
+    os.replace(bin_path + '.tmp', bin_path)
+    os.replace(index_path + '.tmp', index_path)
+
+
+def load_store(base, files=None):
+    """
+    Returns {csv path: (n, 2) float32 view into trajs.bin, or None}. The
+    store is rebuilt first if any CSV was added, removed or modified.
+    """
+    if files is None:
+        files = find_csvs(base)
+    stamps = _stamps(files)
+    index = _read_index(base)
+    if index is None or dict(zip(index['names'], map(tuple, index['stamps']))) != stamps:
+        build_store(base, files)
+        index = _read_index(base)
+
+    mm = _open_bin(base, index)
+    store = {}
+    for name, s, l in zip(index['names'], index['starts'], index['lengths']):
+        store[os.path.join(base, name)] = mm[s:s+l] if l else None
+    return store
+
+
+def main():
+    base = os.path.dirname(os.path.abspath(__file__))
+    files = find_csvs(base)
+    if not files:
+        print("No matching CSVs found in", base)
+        return
+    build_store(base, files)
+    print(f"Stored {len(files)} trajectories in {STORE_BIN} / {STORE_INDEX}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,54 +1,58 @@
 #!/usr/bin/env python3
 import re
 import sys
+import numpy as np
+
+# { dx, dy, dist, { d0, d1, ... } } -- one SpeedProfile entry
+ENTRY_PAT = re.compile(r'\{\s*([^,{}]+),\s*([^,{}]+),\s*([^,{}]+),\s*\{([^{}]*)\}\s*,?\s*\}')
+# C/C++ comments, blanked out before matching entries
+COMMENT_PAT = re.compile(r'//[^\n]*|/\*.*?\*/', re.S)
+# 'f' float suffix, e.g. 0.25f or 1.f
+SUFFIX_PAT = re.compile(r'(?<=[\d.])[fF]\b')
+
+
+def _blank(m):
+    # keep newlines so offsets still map to the right line numbers
+    return re.sub(r'[^\n]', ' ', m.group())
+
+
+def _parse_block(block):
+    try:
+        return np.fromstring(block, sep=',')
+    except ValueError:
+        # non-numeric tokens: keep the ones that parse, like the old line loop
+        vals = []
+        for tok in block.split(','):
+            try:
+                vals.append(float(tok))
+            except ValueError:
+                pass
+        return np.array(vals)
+
 
 def parse_profiles(header_path):
     """
     Parse the SpeedProfile entries from the given header file.
-    Returns a list of tuples (dist, data_list).
+    Returns a list of tuples (dist, data_array).
     """
     with open(header_path, 'r') as f:
-        lines = f.readlines()
+        text = COMMENT_PAT.sub(_blank, f.read())
 
     profiles = []
-    i = 0
-    # look for each entry starting with a lone '{'
-    while i < len(lines):
-        if lines[i].strip() == "{":
-            # next line has dx, dy, dist,
-            header_line = lines[i+1].strip().rstrip(',')
-            parts = [p.strip() for p in header_line.split(',')]
-            if len(parts) >= 3:
-                dist = float(parts[2].rstrip('f'))
-            else:
-                i += 1
-                continue
-
-            # skip to the opening brace of the data array
-            # which should be two lines down
-            j = i + 3
-            data = []
-            # collect floats until the closing '}'
-            while j < len(lines):
-                line = lines[j].strip()
-                if line.startswith('}'):
-                    break
-                # strip trailing commas and 'f' suffix
-                val_str = line.rstrip(',').rstrip('f')
-                try:
-                    data.append(float(val_str))
-                except ValueError:
-                    pass
-                j += 1
-
-            if len(data) == 100:
-                profiles.append((dist, data))
-            else:
-                print(f"Warning: found {len(data)} data points (expected 100) at entry starting line {i+1}", file=sys.stderr)
+    for m in ENTRY_PAT.finditer(text):
+        try:
+            dist = float(SUFFIX_PAT.sub('', m.group(3)))
+        except ValueError:
+            continue
+        # strip 'f' suffixes and the trailing comma before the C-level parse
+        block = SUFFIX_PAT.sub('', m.group(4)).strip().rstrip(',')
+        data = _parse_block(block)
 
-            # move index past this entry
-            i = j
-        i += 1
+        if data.size == 100:
+            profiles.append((dist, data))
+        else:
+            line_no = text.count('\n', 0, m.start()) + 1
+            print(f"Warning: found {data.size} data points (expected 100) at entry starting line {line_no}", file=sys.stderr)
 
     return profiles
 
@@ -57,12 +61,12 @@ def check_distances(profiles, tol=1e-6):
     For each profile, compare dist to sum(data).
     Prints any mismatches.
     """
-    mismatches = []
-    for idx, (dist, data) in enumerate(profiles):
-        s = sum(data)
-        if abs(s - dist) > tol:
-            mismatches.append((idx, dist, s))
-    return mismatches
+    if not profiles:
+        return []
+    dists = np.fromiter((p[0] for p in profiles), dtype=np.float64, count=len(profiles))
+    sums = np.stack([p[1] for p in profiles]).sum(axis=1)
+    bad = np.nonzero(np.abs(sums - dists) > tol)[0]
+    return [(int(idx), dists[idx], sums[idx]) for idx in bad]
 
 def main():
     if len(sys.argv) != 2:
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+TrajUtils.py
+
+Helpers shared by the trajectory scripts.
+"""
+import numpy as np
+
+
+def unwrap_deg(angle_list):
+    """Unwraps a sequence of angles across ±180° boundary, returns ndarray."""
+    return np.unwrap(np.asarray(angle_list, dtype=np.float64), period=360.0)
+
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+build_frechet.py
+
+Compiles frechet.c into the _frechet extension module with cffi. Once it
+is built next to AnalyseAll.py, the Fréchet distance matrix is computed
+by the C/OpenMP code instead of the Numba kernels.
+
+Dependencies:
+  cffi, a C compiler with OpenMP support
+
+Usage:
+    python build_frechet.py
+"""
+import os
+import sys
+from cffi import FFI
+
+base = os.path.dirname(os.path.abspath(__file__))
+
+ffibuilder = FFI()
+ffibuilder.cdef("""
+    int frechet_matrix(const float *pts, const int64_t *starts,
+                       const int64_t *lens, int64_t N, double cap, double *out);
+""")
+
+if sys.platform == 'win32':
+    compile_args, link_args = ['/O2', '/openmp'], []
+else:
+    compile_args = ['-O3', '-march=native', '-fopenmp']
+    link_args = ['-fopenmp']
+
+with open(os.path.join(base, 'frechet.c')) as f:
+    ffibuilder.set_source('_frechet', f.read(),
+                          extra_compile_args=compile_args,
+                          extra_link_args=link_args)
+
+if __name__ == '__main__':
+    ffibuilder.compile(tmpdir=base, verbose=True)
@@ -0,0 +1,117 @@
+/*
+ * frechet.c
+ *
+ * C/OpenMP version of the pairwise discrete Fréchet matrix used by
+ * AnalyseAll.py. Built into the _frechet module by build_frechet.py;
+ * AnalyseAll.py falls back to its Numba kernels when it is missing.
+ *
+ * pts holds every trajectory back to back as float32 (x, y) rows, with
+ * trajectory i at rows starts[i] .. starts[i] + lens[i]. out is the N x N
+ * float64 distance matrix and is written in both triangles. Pairs whose
+ * distance exceeds cap hold a lower bound (> cap) instead, exactly like
+ * the Numba path. Returns 0 on success and -1 if a scratch buffer could
+ * not be allocated, in which case out is incomplete.
+ *
+ * The DP runs on squared distances (sqrt is monotonic, so max/min pick
+ * the same cells) and takes one sqrt per pair at the end.
+ */
+#include <math.h>
+#include <stdint.h>
+#include <stdlib.h>
+
+static float point_d2(const float *a, const float *b)
+{
+    float dx = a[0] - b[0], dy = a[1] - b[1];
+    return dx*dx + dy*dy;
+}
+
+/* Squared distances from p to every point of Q, written to d2. Plain
+ * loop so the compiler can vectorize it for the target ISA. */
+static void row_d2(const float *p, const float *Q, int64_t m, float *d2)
+{
+    float px = p[0], py = p[1];
+    int64_t j;
+    for (j = 0; j < m; j++) {
+        float dx = px - Q[2*j], dy = py - Q[2*j + 1];
+        d2[j] = dx*dx + dy*dy;
+    }
+}
+
+/* Squared Fréchet distance with two rolling rows of length m (m <= n). */
+static float frechet2(const float *P, int64_t n, const float *Q, int64_t m,
+                      double cap2, float *prev, float *cur, float *d2)
+{
+    int64_t i, j;
+    float *tmp;
+
+    row_d2(P, Q, m, d2);
+    prev[0] = d2[0];
+    for (j = 1; j < m; j++)
+        prev[j] = fmaxf(prev[j-1], d2[j]);
+
+    for (i = 1; i < n; i++) {
+        float row_min;
+        row_d2(P + 2*i, Q, m, d2);
+        cur[0] = fmaxf(prev[0], d2[0]);
+        row_min = cur[0];
+        for (j = 1; j < m; j++) {
+            float best = fminf(fminf(prev[j], cur[j-1]), prev[j-1]);
+            cur[j] = fmaxf(best, d2[j]);
+            row_min = fminf(row_min, cur[j]);
+        }
+        /* every coupling crosses row i, see AnalyseAll._frechet_kernel */
+        if (row_min > cap2)
+            return row_min;
+        tmp = prev; prev = cur; cur = tmp;
+    }
+    return prev[m-1];
+}
+
+int frechet_matrix(const float *pts, const int64_t *starts,
+                   const int64_t *lens, int64_t N, double cap, double *out)
+{
+    int64_t npairs = N * (N - 1) / 2, maxlen = 0, i;
+    double cap2 = cap * cap;
+    int failed = 0;
+
+    for (i = 0; i < N; i++)
+        if (lens[i] > maxlen)
+            maxlen = lens[i];
+
+    #pragma omp parallel
+    {
+        float *buf = malloc(3 * maxlen * sizeof(float));
+        int64_t k;
+
+        if (buf == NULL) {
+            #pragma omp critical
+            failed = 1;
+        }
+
+        #pragma omp for schedule(dynamic, 16)
+        for (k = 0; k < npairs; k++) {
+            /* every thread has to reach the loop, so just skip the work */
+            if (buf == NULL)
+                continue;
+            /* decode flat upper-triangle index k -> (a, b) with a < b */
+            int64_t a = N - 2 - (int64_t)(sqrt(-8.0*k + 4.0*N*(N-1) - 7.0) / 2.0 - 0.5);
+            int64_t b = k + a + 1 - npairs + (N - a) * (N - a - 1) / 2;
+            const float *P = pts + 2*starts[a], *Q = pts + 2*starts[b];
+            int64_t n = lens[a], m = lens[b];
+            float lb2, d2;
+
+            if (m > n) {
+                const float *t = P; P = Q; Q = t;
+                n = lens[b]; m = lens[a];
+            }
+            lb2 = fmaxf(point_d2(P, Q), point_d2(P + 2*(n-1), Q + 2*(m-1)));
+            if (lb2 > cap2)
+                d2 = lb2;
+            else
+                d2 = frechet2(P, n, Q, m, cap2, buf, buf + maxlen, buf + 2*maxlen);
+            out[a*N + b] = out[b*N + a] = sqrt(d2);
+        }
+        free(buf);
+    }
+    return failed ? -1 : 0;
+}